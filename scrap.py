@@ -1,12 +1,50 @@
 import os
 import re
-import json
-from urllib.parse import urljoin
-from playwright.sync_api import sync_playwright
+import string
+import orjson
+import asyncio
+import contextlib
+from urllib.parse import urljoin, urlsplit
+from playwright.async_api import async_playwright, Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
 from tqdm import tqdm
 
 BASE_URL = "https://questions.examside.com"
 
+# Analytics, plus the CDNs MathJax is loaded from (MathJax would rewrite the
+# question HTML). These fail DNS inside Chromium, so no request ever reaches
+# Python; anything else the site pulls from those CDNs is blocked too
+BLOCKED_HOSTS = (
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "hotjar.com",
+    "cdn.jsdelivr.net", "cdnjs.cloudflare.com", "cdn.mathjax.org",
+)
+
+# Questions are parsed from HTML/text, so Chromium is told not to fetch images
+# or web fonts and to skip background work that only costs bandwidth. Blocking
+# is done with flags only: any context.route() turns off the HTTP cache
+BROWSER_ARGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--disable-remote-fonts",
+    "--autoplay-policy=user-gesture-required",
+    "--host-resolver-rules=" + ", ".join(
+        f"MAP {pattern} ~NOTFOUND" for host in BLOCKED_HOSTS for pattern in (host, f"*.{host}")
+    ),
+    "--disable-features=Translate,BackForwardCache",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-extensions",
+]
+
+# Number of pages scraping question pages in parallel
+CONCURRENCY = 8
+
+# Navigations only wait for the DOM; anything slower than this is skipped
+NAV_TIMEOUT = 30000
+
+# Chromium profile dir, so the HTTP cache survives across pages and runs. This
+# only holds while nothing is routed: Playwright disables the cache as soon as
+# any context.route()/page.route() is registered
+USER_DATA_DIR = "./.pw-cache"
+
 
 # ---------------- CHAPTER URLS ----------------
 
@@ -55,6 +93,17 @@ CHAPTER_URLS = [
 
 # ---------------- HELPERS ----------------
 
+_YEAR_RE = re.compile(r"(20\d{2})")
+# Bytes normalize_id strips after lowercasing (non-ASCII is dropped by encode)
+_ID_KEEP = (string.ascii_lowercase + string.digits).encode()
+_ID_DELETE = bytes(c for c in range(128) if c not in _ID_KEEP)
+# "Correct answer is X", "Correct Answer: X", "Correct Answer = X"
+_NUM_RE = re.compile(
+    r"Correct\s+answer\s+is\s+([-+]?\d*\.?\d+)|Correct\s+Answer\s*[:=]\s*([-+]?\d*\.?\d+)",
+    re.IGNORECASE,
+)
+
+
 def parse_subject_and_chapter(path):
     parts = path.strip("/").split("/")
     # parts = ['past-years', 'jee', 'jee-main', 'physics', 'circular-motion']
@@ -66,12 +115,38 @@ def parse_subject_and_chapter(path):
 
 
 def normalize_id(text):
-    return re.sub(r"[^a-z0-9]", "", text.lower())
-
-
-def extract_metadata(header, exam_from_url):
+    return text.lower().encode("ascii", "ignore").translate(None, _ID_DELETE).decode()
+
+
+def load_done(path):
+    # Question URLs already written to a chapter file by an earlier run, and the
+    # highest id index used there. A torn last line from an interrupted run is
+    # cut off so appends start a fresh line
+    done = set()
+    last_idx = 0
+    if not os.path.exists(path):
+        return done, last_idx
+
+    end = 0
+    with open(path, "rb+") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            end += len(line)
+            try:
+                record = orjson.loads(line)
+                # Ids end in "-<index>"; records from before "url" existed still count
+                last_idx = max(last_idx, int(record["id"].rsplit("-", 1)[1]))
+                done.add(record["url"])
+            except (orjson.JSONDecodeError, KeyError, TypeError, IndexError, ValueError):
+                pass  # not a (current) question record
+        f.truncate(end)
+    return done, last_idx
+
+
+def extract_metadata(header, exam_display):
     meta = {
-        "exam": exam_from_url.replace("-", " "),  # Convert 'jee-main' to 'jee main'
+        "exam": exam_display,  # e.g. 'jee main', precomputed once per chapter
         "year": "",
         "mode": "",
         "date": "",
@@ -81,7 +156,7 @@ def extract_metadata(header, exam_from_url):
 
     t = header.lower()
 
-    y = re.search(r"(20\d{2})", t)
+    y = _YEAR_RE.search(t)
     if y:
         meta["year"] = y.group(1)
 
@@ -96,59 +171,127 @@ def extract_metadata(header, exam_from_url):
     return meta
 
 
-def extract_html(el):
-    return el.inner_html().strip() if el else ""
+def extract_numeric_answer(text):
+    m = _NUM_RE.search(text)
+    return (m.group(1) or m.group(2)) if m else None
 
 
-def is_correct_option(opt):
-    cls = (opt.get_attribute("class") or "").lower()
-    if any(k in cls for k in ["correct", "green", "success"]):
-        return True
-    if opt.get_attribute("aria-checked") == "true":
-        return True
-    if opt.query_selector("span:has-text('Correct')"):
-        return True
-    return False
+# ---------------- PAGE SCRIPTS ----------------
 
+# Installed once on the context with add_init_script, so every page defines
+# window.__scraper and each call below only sends a short stub over the wire
+SCRAPER_JS = """
+window.__scraper = (() => {
+    const root = () => document.querySelector('.question-component');
+    const optionButtons = (r) => {
+        const optRoot = r.querySelector('.options');
+        return optRoot ? [...optRoot.querySelectorAll('[role=button]')] : null;
+    };
+    const isCorrect = (el) =>
+        /correct|green|success/.test((el.className || '').toLowerCase())
+        || el.getAttribute('aria-checked') === 'true'
+        || [...el.querySelectorAll('span')].some(s => /correct/i.test(s.textContent));
 
-def extract_numeric_answer(root):
-    text = root.inner_text()
-    # Try multiple patterns: "Correct answer is X", "Correct Answer: X", "Correct Answer = X"
-    patterns = [
-        r"Correct answer is\s+([-+]?\d*\.?\d+)",
-        r"Correct Answer\s*[:=]\s*([-+]?\d*\.?\d+)",
-    ]
-    for pattern in patterns:
-        m = re.search(pattern, text, re.IGNORECASE)
-        if m:
-            return m.group(1)
-    return None
+    return {
+        // Clicks an in-page link to the question at `path`, if the page has one
+        followLink(path) {
+            const link = [...document.querySelectorAll("a[href*='/question/']")]
+                .find(a => new URL(a.href, location.href).pathname === path);
+            if (!link) return false;
+            window.__prevQuestion = document.querySelector('.question-component .question')?.innerHTML;
+            link.click();
+            return true;
+        },
+
+        // True once client-side routing has rendered the question at `path`
+        routed(path) {
+            const q = document.querySelector('.question-component .question');
+            return location.pathname === path && !!q && q.innerHTML !== window.__prevQuestion;
+        },
+
+        // Everything read from the question page before "Check Answer" is clicked
+        question() {
+            const r = root();
+            const text = (sel) => r.querySelector(sel)?.innerText || '';
+            const options = optionButtons(r);
+            return {
+                header: text('.font-semibold'),
+                badge: text('.px-1\\\\.5').toLowerCase(),
+                question_html: (r.querySelector('.question')?.innerHTML || '').trim(),
+                options: options && options.map(el => ({
+                    label: (el.querySelector('div:first-child')?.innerText || '').trim().toLowerCase(),
+                    html: el.innerHTML,
+                })),
+            };
+        },
+
+        // True once "Check Answer" has marked an option or printed a numeric answer
+        answerReady() {
+            const r = root();
+            return (optionButtons(r) || []).some(isCorrect)
+                || /correct\\s+answer\\s*(is|[:=])/i.test(r.innerText);
+        },
+
+        // Everything read once the answer has been revealed
+        answer() {
+            const r = root();
+            const options = optionButtons(r);
+            const heading = [...document.querySelectorAll('h2')].find(h => /explanation/i.test(h.textContent));
+            return {
+                correct_flags: options && options.map(isCorrect),
+                text: r.innerText,
+                explanation_html: (heading?.nextElementSibling?.innerHTML || '').trim(),
+            };
+        },
+    };
+})();
+"""
+
+# about:blank and error pages never ran the init script, hence the ?. guard
+FOLLOW_LINK_JS = "path => window.__scraper?.followLink(path) ?? false"
+ROUTED_JS = "path => window.__scraper.routed(path)"
+QUESTION_JS = "() => window.__scraper.question()"
+ANSWER_READY_JS = "() => window.__scraper.answerReady()"
+ANSWER_JS = "() => window.__scraper.answer()"
 
 
 # ---------------- SCRAPING ----------------
 
-def extract_links(page):
+async def extract_links(page):
     links = set()
-    for a in page.query_selector_all("a[href*='/question/']"):
-        href = a.get_attribute("href")
+    for a in await page.query_selector_all("a[href*='/question/']"):
+        href = await a.get_attribute("href")
         if href:
-            links.add(urljoin(BASE_URL, href))
-    return list(links)
+            # Drop query/fragment so URL variants of one question collapse
+            links.add(urlsplit(urljoin(BASE_URL, href))._replace(query="", fragment="").geturl())
+    # Sorted so a fresh chapter is numbered the same way on every run
+    return sorted(links)
+
+
+async def open_question(page, url):
+    # The site routes between questions client-side, so when the current page
+    # links to this question, follow it in place instead of reloading the app
+    path = urlsplit(url).path
+    try:
+        if await page.evaluate(FOLLOW_LINK_JS, path):
+            await page.wait_for_function(ROUTED_JS, arg=path, timeout=5000)
+            return
+    except PlaywrightError:
+        # Timed out, or a real navigation tore down the context; load it fresh
+        pass
 
+    await page.goto(url, wait_until="domcontentloaded")
+    await page.wait_for_selector(".question-component", timeout=20000)
 
-def scrape_question(page, url, idx, exam, subject, chapter_name):
-    page.goto(url, timeout=60000)
-    page.wait_for_selector(".question-component", timeout=20000)
 
-    root = page.query_selector(".question-component")
+async def scrape_question(page, url, qid, exam_display, subject, chapter_name):
+    await open_question(page, url)
 
-    metadata = extract_metadata(
-        root.query_selector(".font-semibold").inner_text(),
-        exam
-    )
+    q = await page.evaluate(QUESTION_JS)
 
-    badge = root.query_selector(".px-1\\.5")
-    qtype = badge.inner_text().lower() if badge else ""
+    metadata = extract_metadata(q["header"], exam_display)
+
+    qtype = q["badge"]
 
     # Determine question type
     if "single" in qtype:
@@ -160,21 +303,21 @@ def scrape_question(page, url, idx, exam, subject, chapter_name):
     else:
         question_type = "other"
 
-    question_html = extract_html(root.query_selector(".question"))
-
-    options = []
-    correct = []
-
-    opt_root = root.query_selector(".options")
-    if opt_root:
-        for opt in opt_root.query_selector_all("[role='button']"):
-            label = opt.query_selector("div:first-child").inner_text().strip().lower()
-            options.append({"label": label, "html": opt.inner_html()})
+    question_html = q["question_html"]
+    options = q["options"] or []
 
-    btn = page.query_selector("button:has-text('Check Answer')")
+    btn = await page.query_selector("button:has-text('Check Answer')")
     if btn:
-        btn.click()
-        page.wait_for_timeout(400)
+        await btn.click()
+        # "other" questions never get an answer marked, so don't wait on them
+        if question_type != "other":
+            try:
+                await page.wait_for_function(ANSWER_READY_JS, timeout=2000)
+            except PlaywrightTimeoutError:
+                # Answer never showed up; read whatever is there
+                pass
+
+    a = await page.evaluate(ANSWER_JS)
 
     answer = {"type": question_type, "value": None}
 
@@ -182,11 +325,9 @@ def scrape_question(page, url, idx, exam, subject, chapter_name):
     if question_type == "other":
         # Skip answer extraction for other types
         pass
-    elif question_type.startswith("mcq") and opt_root:
-        for opt in opt_root.query_selector_all("[role='button']"):
-            label = opt.query_selector("div:first-child").inner_text().strip().lower()
-            if is_correct_option(opt):
-                correct.append(label)
+    elif question_type.startswith("mcq") and a["correct_flags"] is not None:
+        # Flags come back in the same order as the option labels read above
+        correct = [opt["label"] for opt, ok in zip(options, a["correct_flags"]) if ok]
 
         if question_type == "mcq_single" and correct:
             answer["value"] = correct[0]
@@ -194,15 +335,11 @@ def scrape_question(page, url, idx, exam, subject, chapter_name):
             answer["value"] = "".join(sorted(correct))
 
     elif question_type == "numerical":
-        answer["value"] = extract_numeric_answer(root)
-
-    explanation_html = ""
-    h = page.query_selector("h2:has-text('Explanation')")
-    if h:
-        explanation_html = extract_html(h.evaluate_handle("e => e.nextElementSibling"))
+        answer["value"] = extract_numeric_answer(a["text"])
 
     return {
-        "id": f"{subject}-{normalize_id(chapter_name)}-{idx}",
+        "id": qid,
+        "url": url,
         "source": "examgoal",
         "subject": subject,
         "chapter": chapter_name,
@@ -211,53 +348,102 @@ def scrape_question(page, url, idx, exam, subject, chapter_name):
         "question_html": question_html,
         "options": options,
         "answer": answer,
-        "explanation_html": explanation_html
+        "explanation_html": a["explanation_html"]
     }
 
 
-# ---------------- MAIN ----------------
+async def collect_links(page, chapter_queue, chapters):
+    # Visits chapter listings until none are left, recording their question links
+    while not chapter_queue.empty():
+        chapter_path = chapter_queue.get_nowait()
+        chapter_url = BASE_URL + chapter_path
+        try:
+            await page.goto(chapter_url, wait_until="domcontentloaded")
+            await page.wait_for_selector("a[href*='/question/']", timeout=20000)
+        except PlaywrightError as e:  # timeouts as well as net::ERR_* failures
+            print("❌", chapter_url, e)
+            continue
+
+        links = await extract_links(page)
+        print(f"📘 {chapter_path}: {len(links)} questions")
+        chapters.append((chapter_path, links))
+
+
+async def worker(page, queue, pbar):
+    # Each worker owns one page and drains the shared queue until cancelled
+    while True:
+        chapter, qurl, qid = await queue.get()
+        exam_display, subject, chapter_name, fout = chapter
+        try:
+            data = await scrape_question(page, qurl, qid, exam_display, subject, chapter_name)
+            # One JSON object per line; workers share the chapter file
+            fout.write(orjson.dumps(data) + b"\n")
+        except Exception as e:
+            print("❌", qurl, e)
+        finally:
+            pbar.update(1)
+            queue.task_done()
 
-def main():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context()
 
-        def block_mathjax(route):
-            url = route.request.url.lower()
-            if "mathjax" in url and ("cdn.jsdelivr.net" in url or "cdnjs" in url):
-                route.abort()
-            else:
-                route.continue_()
-
-        context.route("**/*", block_mathjax)
-        page = context.new_page()
+# ---------------- MAIN ----------------
 
+async def main():
+    # The stack closes the chapter files, then the context, even when a phase
+    # fails, so buffered lines are flushed before the browser goes away
+    async with async_playwright() as p, contextlib.AsyncExitStack() as stack:
+        context = await p.chromium.launch_persistent_context(
+            USER_DATA_DIR, headless=True, args=BROWSER_ARGS
+        )
+        stack.push_async_callback(context.close)
+
+        # Settings live on the context so every page inherits them
+        context.set_default_navigation_timeout(NAV_TIMEOUT)
+        await context.add_init_script(SCRAPER_JS)
+
+        # One page per worker, opened once and kept for both phases; a page
+        # left on a listing or question also lets open_question route in place
+        pages = [await context.new_page() for _ in range(CONCURRENCY)]
+
+        # Phase 1: collect question links from every chapter listing in parallel
+        chapter_queue = asyncio.Queue()
         for chapter_path in CHAPTER_URLS:
+            chapter_queue.put_nowait(chapter_path)
+
+        chapters = []
+        await asyncio.gather(*(collect_links(page, chapter_queue, chapters) for page in pages))
+
+        # Phase 2: scrape all questions from one flat queue
+        queue = asyncio.Queue()
+        for chapter_path, links in chapters:
             exam, subject, chapter_slug, chapter_name = parse_subject_and_chapter(chapter_path)
-            chapter_url = BASE_URL + chapter_path
 
             # Create nested folder structure matching URL: data/jee/jee-main/physics/circular-motion
             out_dir = f"data/jee/{exam}/{subject}/{chapter_slug}"
             os.makedirs(out_dir, exist_ok=True)
 
-            print(f"\n📘 Scraping: {exam} / {subject} / {chapter_name}")
-
-            page.goto(chapter_url, timeout=60000)
-            page.wait_for_selector("a[href*='/question/']", timeout=20000)
+            # Append to what an earlier run left behind and skip those questions
+            path = os.path.join(out_dir, f"{chapter_slug}.jsonl")
+            done, last_idx = load_done(path)
+            fout = stack.enter_context(open(path, "ab"))
+            # Per-chapter constants, computed once rather than per question
+            chapter = (exam.replace("-", " "), subject, chapter_name, fout)
+            id_prefix = f"{subject}-{normalize_id(chapter_name)}-"
+            # Skip on the canonical URL, and number new questions after the last
+            # index on disk so ids never clash when the site adds or drops some
+            new_links = [qurl for qurl in links if qurl not in done]
+            for i, qurl in enumerate(new_links, last_idx + 1):
+                queue.put_nowait((chapter, qurl, f"{id_prefix}{i}"))
 
-            links = extract_links(page)
+        print(f"\n📘 Scraping {queue.qsize()} questions from {len(chapters)} chapters")
 
-            for i, qurl in enumerate(tqdm(links), 1):
-                try:
-                    data = scrape_question(page, qurl, i, exam, subject, chapter_name)
-                    fname = f"{normalize_id(subject)}-{normalize_id(chapter_name)}-{i}.json"
-                    with open(os.path.join(out_dir, fname), "w", encoding="utf-8") as f:
-                        json.dump(data, f, ensure_ascii=False, indent=2)
-                except Exception as e:
-                    print("❌", qurl, e)
+        pbar = stack.enter_context(tqdm(total=queue.qsize()))
+        workers = [asyncio.create_task(worker(page, queue, pbar)) for page in pages]
 
-        browser.close()
+        await queue.join()
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())